@@ -1,12 +1,39 @@
 import tkinter as tk
 from tkinter import ttk
-from typing import Dict, List
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
 
-class CCMappingFrame(ttk.LabelFrame):
+def _safe_int(text: str) -> Optional[int]:
+    try:
+        return int(text.strip())
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+def _safe_midi_data(text: str) -> Optional[int]:
+    # CC numbers and values are 7-bit MIDI data bytes; mido rejects anything else
+    value = _safe_int(text)
+    return value if value is not None and 0 <= value <= 127 else None
+
+class BatchInsertMixin:
+    """Bulk row insertion for frames that stack rows inside ``rows_container``."""
+    
+    rows_container: ttk.Frame
+    
+    @contextmanager
+    def batch(self):
+        # Defer geometry propagation so bulk adds cost one layout pass
+        self.rows_container.pack_propagate(False)
+        try:
+            yield
+        finally:
+            self.rows_container.pack_propagate(True)
+            self.rows_container.update_idletasks()
+
+class CCMappingFrame(BatchInsertMixin, ttk.LabelFrame):
 
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, text="MIDI CC Mappings", *args, **kwargs)
-        self.cc_mappings: List[Dict] = []
+        self.cc_mappings: Dict[int, Dict] = {}
         self.setup_ui()
         
     def setup_ui(self):
@@ -15,44 +42,53 @@ class CCMappingFrame(ttk.LabelFrame):
         
         self.mappings_frame = ttk.Frame(self)
         self.mappings_frame.pack(fill='x', expand=True)
+        self.rows_container = self.mappings_frame
+        
+    def add_cc_mappings(self, mappings: Iterable[Tuple[str, str]]):
+        with self.batch():
+            for cc_num, label in mappings:
+                self.add_cc_mapping(cc_num, label)
         
-    def add_cc_mapping(self):
+    def add_cc_mapping(self, initial_cc_num="", initial_label=""):
         mapping_frame = ttk.Frame(self.mappings_frame)
         mapping_frame.pack(fill='x', pady=2)
         
         ttk.Label(mapping_frame, text="CC#:").pack(side='left', padx=2)
         cc_num = ttk.Entry(mapping_frame, width=5)
+        cc_num.insert(0, initial_cc_num)
         cc_num.pack(side='left', padx=2)
         
         ttk.Label(mapping_frame, text="Label:").pack(side='left', padx=2)
         label = ttk.Entry(mapping_frame, width=20)
+        label.insert(0, initial_label)
         label.pack(side='left', padx=2)
         
+        key = id(mapping_frame)
         remove_btn = ttk.Button(mapping_frame, text="×", width=3,
-                              command=lambda: self.remove_mapping(mapping_frame))
+                              command=lambda k=key: self.remove_mapping(k))
         remove_btn.pack(side='right', padx=2)
         
-        self.cc_mappings.append({
+        self.cc_mappings[key] = {
             'frame': mapping_frame,
             'cc_num': cc_num,
             'label': label
-        })
+        }
         
-    def remove_mapping(self, frame):
-        frame.destroy()
-        self.cc_mappings = [m for m in self.cc_mappings if m['frame'] != frame]
+    def remove_mapping(self, key: int):
+        self.cc_mappings.pop(key)['frame'].destroy()
         
     def get_mappings(self) -> Dict[int, str]:
         return {
-            int(m['cc_num'].get()): m['label'].get()
-            for m in self.cc_mappings
-            if m['cc_num'].get().isdigit()
+            cc_num: m['label'].get()
+            for m in self.cc_mappings.values()
+            for cc_num in (_safe_midi_data(m['cc_num'].get()),)
+            if cc_num is not None
         }
 
-class CCValuesFrame(ttk.LabelFrame):
+class CCValuesFrame(BatchInsertMixin, ttk.LabelFrame):
     def __init__(self, parent, *args, **kwargs):
         super().__init__(parent, text="CC Values", *args, **kwargs)
-        self.values: List[tk.StringVar] = []
+        self.values: Dict[int, Dict] = {}
         self.setup_ui()
         
     def setup_ui(self):
@@ -61,6 +97,12 @@ class CCValuesFrame(ttk.LabelFrame):
         
         self.values_frame = ttk.Frame(self)
         self.values_frame.pack(fill='x', expand=True)
+        self.rows_container = self.values_frame
+        
+    def add_values(self, initial_values: Iterable[str]):
+        with self.batch():
+            for value in initial_values:
+                self.add_value(value)
         
     def add_value(self, initial_value="0"):
         value_frame = ttk.Frame(self.values_frame)
@@ -70,18 +112,20 @@ class CCValuesFrame(ttk.LabelFrame):
         value_entry = ttk.Entry(value_frame, textvariable=value_var, width=5)
         value_entry.pack(side='left', padx=2)
         
+        key = id(value_frame)
         remove_btn = ttk.Button(value_frame, text="×", width=3,
-                              command=lambda: self.remove_value(value_frame))
+                              command=lambda k=key: self.remove_value(k))
         remove_btn.pack(side='right', padx=2)
         
-        self.values.append({
+        self.values[key] = {
             'frame': value_frame,
             'var': value_var
-        })
+        }
         
-    def remove_value(self, frame):
-        frame.destroy()
-        self.values = [v for v in self.values if v['frame'] != frame]
+    def remove_value(self, key: int):
+        self.values.pop(key)['frame'].destroy()
         
     def get_values(self) -> List[int]:
-        return [int(v['var'].get()) for v in self.values if v['var'].get().isdigit()]
\ No newline at end of file
+        # Duplicates are kept; run_midi_cc_automation drops them and logs a warning
+        values = (_safe_midi_data(v['var'].get()) for v in self.values.values())
+        return [value for value in values if value is not None]
\ No newline at end of file
@@ -2,12 +2,15 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import logging
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional
 
 from gui_components import CCMappingFrame, CCValuesFrame
 from vst_automation import (
     VSTAutomation, 
     AutomationConfig, 
+    AutomationResult,
     get_default_plugin_directory,
     find_vst_binary_in_bundle
 )
@@ -19,6 +22,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Progress bar refresh interval; caps redraws at 20 Hz however fast renders finish
+PROGRESS_POLL_MS = 50
+
 class VSTAutomationGUI(tk.Tk):
     
     def __init__(self):
@@ -28,7 +34,14 @@ class VSTAutomationGUI(tk.Tk):
         self.geometry("800x600")
         
         self.vst_automation: Optional[VSTAutomation] = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.cancel_event = threading.Event()
+        self.render_progress = (0, 1)
+        self.rendering = False
+        self.render_future: Optional[Future] = None
+        self.render_config: Optional[AutomationConfig] = None
         self.setup_ui()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
         
     def setup_ui(self):
         main_container = ttk.Frame(self)
@@ -50,8 +63,8 @@ class VSTAutomationGUI(tk.Tk):
         path_entry = ttk.Entry(path_frame, textvariable=self.vst_path)
         path_entry.pack(side='left', fill='x', expand=True, padx=5, pady=5)
         
-        browse_btn = ttk.Button(path_frame, text="Browse", command=self.browse_vst)
-        browse_btn.pack(side='left', padx=5, pady=5)
+        self.browse_btn = ttk.Button(path_frame, text="Browse", command=self.browse_vst)
+        self.browse_btn.pack(side='left', padx=5, pady=5)
         
     def setup_common_settings(self, parent):
         rate_frame = ttk.LabelFrame(parent, text="Sample Rate")
@@ -83,6 +96,10 @@ class VSTAutomationGUI(tk.Tk):
         self.note_max = tk.StringVar(value="78")
         ttk.Entry(note_frame, textvariable=self.note_max, width=5).pack(side='left', padx=2)
         
+        self.skip_existing = tk.BooleanVar(value=True)
+        ttk.Checkbutton(parent, text="Skip files that already exist (resume)",
+                        variable=self.skip_existing).pack(anchor='w', pady=5)
+        
     def setup_midi_cc_components(self, parent):
         self.cc_frame = CCMappingFrame(parent)
         self.cc_frame.pack(fill='x', pady=5)
@@ -90,8 +107,7 @@ class VSTAutomationGUI(tk.Tk):
         self.values_frame = CCValuesFrame(parent)
         self.values_frame.pack(fill='x', pady=5)
         
-        self.values_frame.add_value("0")
-        self.values_frame.add_value("100")
+        self.values_frame.add_values(["0", "100"])
         
     def setup_action_buttons(self, parent):
         btn_frame = ttk.Frame(parent)
@@ -104,6 +120,13 @@ class VSTAutomationGUI(tk.Tk):
         self.run_btn = ttk.Button(btn_frame, text="Run Automation", 
                                 command=self.run_automation, state='disabled')
         self.run_btn.pack(side='left', padx=5)
+        
+        self.cancel_btn = ttk.Button(btn_frame, text="Cancel", 
+                                   command=self.cancel_automation, state='disabled')
+        self.cancel_btn.pack(side='left', padx=5)
+        
+        self.progress = ttk.Progressbar(parent, mode='determinate')
+        self.progress.pack(fill='x', pady=5)
             
     def browse_vst(self):
             initial_dir = get_default_plugin_directory()
@@ -155,7 +178,8 @@ class VSTAutomationGUI(tk.Tk):
             
     def finish_config(self, dialog):
         dialog.destroy()
-        self.run_btn.config(state='normal')
+        if not self.rendering:
+            self.run_btn.config(state='normal')
         
     def run_automation(self):
         try:
@@ -168,23 +192,86 @@ class VSTAutomationGUI(tk.Tk):
                 duration=float(self.duration.get()),
                 note_min=int(self.note_min.get()),
                 note_max=int(self.note_max.get()),
-                output_dir="output"
+                output_dir="output",
+                skip_existing=self.skip_existing.get()
             )
+            cc_mappings = self.cc_frame.get_mappings()
+            cc_values = self.values_frame.get_values()
+            
+            self.cancel_event.clear()
+            self.render_progress = (0, 1)
+            self.rendering = True
+            self.set_render_controls(running=True)
             
-            self.vst_automation.run_midi_cc_automation(
+            # Render on the worker thread; poll_progress picks up the result on the Tk thread
+            self.render_config = config
+            self.render_future = self.executor.submit(
+                self.vst_automation.run_midi_cc_automation,
                 config=config,
-                cc_mappings=self.cc_frame.get_mappings(),
-                cc_values=self.values_frame.get_values()
-            )
-                
-            messagebox.showinfo(
-                "Success", 
-                f"Automation completed!\nFiles saved in {config.output_dir}"
+                cc_mappings=cc_mappings,
+                cc_values=cc_values,
+                progress_cb=self.record_progress,
+                cancel_event=self.cancel_event
             )
+            self.poll_progress()
                 
         except Exception as e:
             logger.error(f"Automation failed: {str(e)}")
             messagebox.showerror("Error", f"Automation failed: {str(e)}")
+            
+    def record_progress(self, done: int, total: int):
+        # Called on the worker thread; the UI picks this up in poll_progress
+        self.render_progress = (done, total)
+        
+    def poll_progress(self):
+        self.update_progress()
+        if self.render_future.done():
+            self.automation_finished(self.render_future, self.render_config)
+        else:
+            self.after(PROGRESS_POLL_MS, self.poll_progress)
+            
+    def update_progress(self):
+        done, total = self.render_progress
+        self.progress.config(value=done, maximum=max(total, 1))
+        
+    def set_render_controls(self, running: bool):
+        # The plugin must not be swapped out while the worker is rendering it
+        idle_state = 'disabled' if running else 'normal'
+        self.browse_btn.config(state=idle_state)
+        self.configure_btn.config(state=idle_state)
+        self.run_btn.config(state=idle_state)
+        self.cancel_btn.config(state='normal' if running else 'disabled')
+        
+    def cancel_automation(self):
+        self.cancel_event.set()
+        self.cancel_btn.config(state='disabled')
+        
+    def automation_finished(self, future: Future, config: AutomationConfig):
+        self.rendering = False
+        self.update_progress()
+        self.set_render_controls(running=False)
+        
+        error = future.exception()
+        if error:
+            logger.error(f"Automation failed: {str(error)}")
+            messagebox.showerror("Error", f"Automation failed: {str(error)}")
+            return
+            
+        result: AutomationResult = future.result()
+        skipped_note = (f"\n{result.skipped} of {result.total} files already existed and were skipped"
+                        if result.skipped else "")
+        if not result.completed:
+            messagebox.showinfo("Cancelled", f"Automation cancelled{skipped_note}")
+        else:
+            messagebox.showinfo(
+                "Success", 
+                f"Automation completed!\nFiles saved in {config.output_dir}{skipped_note}"
+            )
+            
+    def on_close(self):
+        self.cancel_event.set()
+        self.executor.shutdown(wait=False)
+        self.destroy()
 
 if __name__ == "__main__":
     app = VSTAutomationGUI()
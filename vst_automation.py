@@ -1,6 +1,9 @@
 import os
 import logging
-from typing import Dict, List, Optional
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 from pedalboard import Plugin, load_plugin
 from pedalboard.io import AudioFile
@@ -14,6 +17,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+__all__ = [
+    'AutomationConfig',
+    'AutomationResult',
+    'VSTAutomation',
+    'midi_to_note_name',
+    'find_vst_binary_in_bundle',
+    'get_default_plugin_directory',
+    'list_available_plugins',
+]
+
+class _PluginRenderError(Exception):
+    """Wraps an exception raised by the plugin itself, as opposed to file I/O."""
+
+# Upper bound on rendered buffers waiting to be written, to cap memory use
+MAX_PENDING_WRITES = 16
+
 @dataclass
 class AutomationConfig:
     sample_rate: int
@@ -21,12 +40,29 @@ class AutomationConfig:
     note_min: int
     note_max: int
     output_dir: str = "output"
+    # Render every CC/value combination for a note in a single plugin call.
+    # Off by default since plugin state can bleed between segments.
+    batch_render: bool = False
+    # Silence between batched segments, in seconds, so release tails don't overlap
+    batch_gap: float = 0.5
+    # Number of notes rendered in parallel, each on its own plugin instance
+    num_workers: int = 1
+    # Resume support: don't re-render files already present in output_dir
+    skip_existing: bool = True
+
+@dataclass
+class AutomationResult:
+    completed: bool  # False if the run was cancelled
+    total: int
+    skipped: int  # renders skipped because the output file already existed
+
+_NOTES = ('C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B')
+_NOTE_NAMES = tuple(f"{_NOTES[i % 12]}{(i // 12) - 1}" for i in range(128))
 
 def midi_to_note_name(midi_number: int) -> str:
-    notes = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-    octave = (midi_number // 12) - 1
-    note_name = notes[midi_number % 12]
-    return f"{note_name}{octave}"
+    if not 0 <= midi_number < len(_NOTE_NAMES):
+        raise ValueError(f"MIDI note number must be in range 0..127, got {midi_number}")
+    return _NOTE_NAMES[midi_number]
 
 class VSTAutomation:
     
@@ -44,63 +80,298 @@ class VSTAutomation:
             
     def save_audio(self, audio: np.ndarray, filepath: str, config: AutomationConfig) -> None:
         try:
-            with AudioFile(filepath, 'w', config.sample_rate, audio.shape[0]) as f:
-                f.write(audio)
+            # Hand the writer a contiguous float32 buffer so it can skip its own conversion
+            audio = np.ascontiguousarray(audio, dtype=np.float32)
+            # Write under a temporary name so an interrupted run never leaves a
+            # truncated file that skip_existing would treat as finished
+            root, ext = os.path.splitext(filepath)
+            part_path = f"{root}.part{ext}"
+            try:
+                with AudioFile(part_path, 'w', config.sample_rate, audio.shape[0]) as f:
+                    f.write(audio)
+                os.replace(part_path, filepath)
+            except BaseException:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                raise
             logger.debug(f"Saved audio file: {filepath}")
         except Exception as e:
             logger.error(f"Failed to save audio file {filepath}: {str(e)}")
             raise
             
+    def save_audio_batch(self, 
+                         segments: List[Tuple[np.ndarray, str]], 
+                         config: AutomationConfig) -> None:
+        for audio, filepath in segments:
+            self.save_audio(audio, filepath, config)
+            
     def run_midi_cc_automation(self, 
                              config: AutomationConfig,
                              cc_mappings: Dict[int, str],
-                             cc_values: List[int]) -> None:
+                             cc_values: List[int],
+                             progress_cb: Optional[Callable[[int, int], None]] = None,
+                             cancel_event: Optional[threading.Event] = None) -> AutomationResult:
+        """
+        Render every note/CC/value combination to output_dir.
+        
+        Returns:
+            AutomationResult: whether the sweep finished and how many renders were skipped
+        """
         if not self.plugin:
             raise RuntimeError("Plugin not loaded. Call load_plugin() first.")
             
         os.makedirs(config.output_dir, exist_ok=True)
         
+        unique_values = list(dict.fromkeys(cc_values))
+        if len(unique_values) != len(cc_values):
+            logger.warning(f"Dropped {len(cc_values) - len(unique_values)} duplicate CC value(s)")
+            cc_values = unique_values
+            
+        items = list(cc_mappings.items())
+        notes = range(config.note_min, config.note_max + 1)
+        if notes:
+            # Validate the bounds once; the render loop indexes _NOTE_NAMES directly
+            midi_to_note_name(notes[0])
+            midi_to_note_name(notes[-1])
+        total = len(notes) * len(items) * len(cc_values)
+        done = 0
+        skipped = 0
+        progress_lock = threading.Lock()
+        failed = threading.Event()
+        
+        # One directory listing up front so existence checks are set lookups
+        preexisting = self._list_outputs(config.output_dir)
+        existing = preexisting if config.skip_existing else frozenset()
+        
+        def advance(count: int, skip_count: int = 0) -> None:
+            nonlocal done, skipped
+            with progress_lock:
+                done += count
+                skipped += skip_count
+                if progress_cb is not None:
+                    progress_cb(done, total)
+                    
+        def should_stop() -> bool:
+            return failed.is_set() or (cancel_event is not None and cancel_event.is_set())
+            
+        def render(plugin: Plugin, worker_notes: range, worker_pending: List[Future]) -> bool:
+            try:
+                return self._render_notes(plugin, worker_notes, config, items, cc_values,
+                                          existing, io_pool, worker_pending, advance, should_stop)
+            except Exception:
+                # Stop the other workers early rather than finishing a doomed run
+                failed.set()
+                raise
+                
+        plugins = self._worker_plugins(max(1, min(config.num_workers, len(notes))))
+        # One pending-write list per worker since _queue_io mutates it in place
+        pending: List[List[Future]] = [[] for _ in plugins]
+        
+        # Writes overlap the next render; the pool lives only as long as the run
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="audio-io") as io_pool:
+            try:
+                if len(plugins) == 1:
+                    completed = render(plugins[0], notes, pending[0])
+                else:
+                    try:
+                        # Stripe notes across workers; pedalboard releases the GIL while rendering
+                        with ThreadPoolExecutor(max_workers=len(plugins),
+                                                thread_name_prefix="render") as pool:
+                            jobs = [
+                                pool.submit(render, plugin, notes[i::len(plugins)], pending[i])
+                                for i, plugin in enumerate(plugins)
+                            ]
+                            completed = all([job.result() for job in jobs])
+                    except _PluginRenderError as e:
+                        # Some plugins break when several instances render at once,
+                        # so retry on the primary instance, skipping files already written
+                        logger.warning(f"Parallel rendering failed, retrying on one thread: {str(e.__cause__)}")
+                        for worker_pending in pending:
+                            self._wait_for_writes(worker_pending)
+                            worker_pending.clear()
+                        written = self._list_outputs(config.output_dir) - preexisting
+                        existing = existing | written
+                        failed.clear()
+                        with progress_lock:
+                            done = skipped = 0
+                        completed = render(self.plugin, notes, pending[0])
+                        # Files written by the parallel attempt didn't exist before this run
+                        skipped = max(0, skipped - len(written))
+                        
+                for worker_pending in pending:
+                    self._wait_for_writes(worker_pending)
+                
+                if skipped:
+                    logger.info(f"Skipped {skipped}/{total} renders with existing output files")
+                if not completed:
+                    logger.info(f"MIDI CC automation cancelled after {done}/{total} renders")
+                else:
+                    logger.info("MIDI CC automation completed successfully")
+                return AutomationResult(completed=completed, total=total, skipped=skipped)
+            
+            except Exception as e:
+                for worker_pending in pending:
+                    for future in worker_pending:
+                        future.cancel()
+                error = e.__cause__ if isinstance(e, _PluginRenderError) else e
+                logger.error(f"MIDI CC automation failed: {str(error)}")
+                if error is e:
+                    raise
+                raise error from None
+                
+    def _list_outputs(self, output_dir: str) -> FrozenSet[str]:
+        out_prefix = os.path.join(output_dir, '')
+        with os.scandir(output_dir) as entries:
+            return frozenset(out_prefix + entry.name for entry in entries if entry.is_file())
+            
+    def _worker_plugins(self, count: int) -> List[Plugin]:
+        """
+        Return one plugin instance per render worker.
+        
+        Many plugins are not safe to call concurrently, so extra workers get
+        their own instance with the configured state copied over. Falls back
+        to the single loaded instance if that is not possible.
+        """
+        plugins = [self.plugin]
+        try:
+            for _ in range(count - 1):
+                plugin = load_plugin(self.plugin_path)
+                self._copy_plugin_state(plugin)
+                plugins.append(plugin)
+        except Exception as e:
+            logger.warning(f"Could not create extra plugin instances, rendering on one thread: {str(e)}")
+            return [self.plugin]
+        return plugins
+
+    def _copy_plugin_state(self, plugin: Plugin) -> None:
+        # raw_state carries presets, samples and modes that aren't exposed as
+        # parameters; older pedalboard versions only let us copy parameters
         try:
-            for note in range(config.note_min, config.note_max + 1):
-                note_name = midi_to_note_name(note)
-                for cc_num, cc_label in cc_mappings.items():
+            plugin.raw_state = self.plugin.raw_state
+            return
+        except Exception as e:
+            logger.warning(f"Could not copy full plugin state, copying parameters only: {str(e)}")
+        for name, parameter in self.plugin.parameters.items():
+            plugin.parameters[name].raw_value = parameter.raw_value
+
+
+    def _render_notes(self,
+                      plugin: Plugin,
+                      notes: range,
+                      config: AutomationConfig,
+                      items: List[Tuple[int, str]],
+                      cc_values: List[int],
+                      existing: FrozenSet[str],
+                      io_pool: ThreadPoolExecutor,
+                      pending: List[Future],
+                      advance: Callable[..., None],
+                      should_stop: Callable[[], bool]) -> bool:
+        # Loop invariants, hoisted out of the render loop
+        duration = config.duration
+        sample_rate = config.sample_rate
+        out_prefix = os.path.join(config.output_dir, '')  # ensures trailing separator
+        note_on_tmpl = Message('note_on', velocity=100)
+        note_off_tmpl = Message('note_off', velocity=0, time=duration)
+        
+        for note in notes:
+            note_name = _NOTE_NAMES[note]
+            
+            if config.batch_render:
+                if should_stop():
+                    return False
+                    
+                messages = []
+                segments = []
+                offset = 0.0
+                skip_count = 0
+                for cc_num, cc_label in items:
+                    path_prefix = f"{out_prefix}{note_name}_cc{cc_num}_{cc_label}_"
+                    cc_tmpl = Message('control_change', control=cc_num)
                     for cc_val in cc_values:
-                        messages = [
-                            Message('control_change', control=cc_num, value=cc_val),
-                            Message('note_on', note=note, velocity=100),
-                            Message('note_off', note=note, velocity=0, time=config.duration)
-                        ]
+                        filepath = f"{path_prefix}{cc_val}.wav"
+                        if filepath in existing:
+                            skip_count += 1
+                            continue
+                            
+                        messages.append(cc_tmpl.copy(value=cc_val, time=offset))
+                        messages.append(note_on_tmpl.copy(note=note, time=offset))
+                        messages.append(note_off_tmpl.copy(note=note, time=offset + duration))
+                        segments.append((int(offset * sample_rate), filepath))
+                        offset += duration + config.batch_gap
                         
-                        audio = self.plugin(messages, 
-                                         duration=config.duration,
-                                         sample_rate=config.sample_rate)
+                if not segments:
+                    advance(skip_count, skip_count)
+                    continue
+                    
+                audio = self._call_plugin(plugin, messages, offset, sample_rate)
+                
+                # Copy since pedalboard may reuse the output buffer
+                audio = audio.copy()
+                segment_len = int(duration * sample_rate)
+                self._queue_io(io_pool, pending, self.save_audio_batch, [
+                    (audio[:, begin:begin + segment_len], filepath)
+                    for begin, filepath in segments
+                ], config)
+                
+                advance(len(segments) + skip_count, skip_count)
+                continue
+                
+            note_on = note_on_tmpl.copy(note=note)
+            note_off = note_off_tmpl.copy(note=note)
+            for cc_num, cc_label in items:
+                path_prefix = f"{out_prefix}{note_name}_cc{cc_num}_{cc_label}_"
+                cc_tmpl = Message('control_change', control=cc_num)
+                for cc_val in cc_values:
+                    if should_stop():
+                        return False
                         
-                        filename = f"{note_name}_cc{cc_num}_{cc_label}_{cc_val}.wav"
-                        filepath = os.path.join(config.output_dir, filename)
-                        self.save_audio(audio, filepath, config)
+                    filepath = f"{path_prefix}{cc_val}.wav"
+                    if filepath in existing:
+                        advance(1, 1)
+                        continue
                         
-            logger.info("MIDI CC automation completed successfully")
-            
+                    messages = [cc_tmpl.copy(value=cc_val), note_on, note_off]
+                    
+                    audio = self._call_plugin(plugin, messages, duration, sample_rate)
+                    
+                    # Copy since pedalboard may reuse the output buffer
+                    self._queue_io(io_pool, pending, self.save_audio, audio.copy(), filepath, config)
+                    advance(1)
+                    
+        return True
+        
+    def _call_plugin(self, plugin: Plugin, messages: List[Message],
+                     duration: float, sample_rate: int) -> np.ndarray:
+        # Tag plugin failures so the parallel path can tell them apart from I/O errors
+        try:
+            return plugin(messages, duration=duration, sample_rate=sample_rate)
         except Exception as e:
-            logger.error(f"MIDI CC automation failed: {str(e)}")
-            raise
+            raise _PluginRenderError(str(e)) from e
+            
+    def _queue_io(self, io_pool: ThreadPoolExecutor, pending: List[Future], 
+                  fn: Callable, *args) -> None:
+        pending.append(io_pool.submit(fn, *args))
+        if len(pending) > MAX_PENDING_WRITES:
+            finished, not_done = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                future.result()
+            pending[:] = not_done
+            
+    def _wait_for_writes(self, pending: List[Future]) -> None:
+        wait(pending)
+        for future in pending:
+            future.result()
             
     def show_editor(self) -> None:
         if not self.plugin:
             raise RuntimeError("Plugin not loaded. Call load_plugin() first.")
         self.plugin.show_editor()
 
-def list_available_plugins(directory: str) -> List[str]:
-    extensions = ('.vst3', '.component', '.au')  # Add more if needed
-    plugins = []
-    
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith(extensions):
-                plugins.append(os.path.join(root, file))
-                
-    return plugins
+@lru_cache(maxsize=1)
+def _platform_is_macos() -> bool:
+    return os.name == 'posix' and os.path.exists('/Library')
 
+@lru_cache(maxsize=256)
 def find_vst_binary_in_bundle(path: str) -> Optional[str]:
     """
     Find the actual VST binary (.so, .vst3, .dll) within a VST3 bundle directory structure.
@@ -124,7 +395,7 @@ def find_vst_binary_in_bundle(path: str) -> Optional[str]:
         if os.name == 'nt':  # Windows
             binary_path = os.path.join(path, 'Contents', 'x86_64-win', '*.vst3')
         elif os.name == 'posix':  # Linux and macOS
-            if os.path.exists('/Library'):  # macOS
+            if _platform_is_macos():
                 binary_path = os.path.join(path, 'Contents', 'MacOS', '*.component')
             else:  # Linux
                 # Check both x86_64-linux and x86_64 directories
@@ -150,8 +421,14 @@ def find_vst_binary_in_bundle(path: str) -> Optional[str]:
         
     return None
 
+@lru_cache(maxsize=1)
 def get_default_plugin_directory() -> str:
-    """Get the default VST plugin directory for the current platform."""
+    """
+    Get the default VST plugin directory for the current platform.
+    
+    The result is cached for the life of the process; call
+    get_default_plugin_directory.cache_clear() to probe again.
+    """
     if os.name == 'nt':  # Windows
         return "C:/Program Files/Common Files/VST3"
     elif os.name == 'posix':  # macOS and Linux
@@ -171,21 +448,27 @@ def get_default_plugin_directory() -> str:
             return linux_vst_dirs[0]
     return "/"
 
+_PLUGIN_EXTENSIONS = ('.vst3', '.component', '.au', '.so')
+
+def _iter_plugins(directory: str) -> Iterator[str]:
+    try:
+        entries = list(os.scandir(directory))
+    except OSError as e:
+        logger.debug(f"Cannot scan plugin directory {directory}: {str(e)}")
+        return
+        
+    for entry in entries:
+        name = entry.name.lower()
+        if entry.is_dir(follow_symlinks=False):
+            # For .vst3 directories, look inside the bundle; the resolver only
+            # knows some platform layouts, so fall back to scanning the bundle
+            binary_path = find_vst_binary_in_bundle(entry.path) if name.endswith('.vst3') else None
+            if binary_path:
+                yield binary_path
+            else:
+                yield from _iter_plugins(entry.path)
+        elif name.endswith(_PLUGIN_EXTENSIONS):
+            yield entry.path
+
 def list_available_plugins(directory: str) -> list[str]:
-    plugins = []
-    vst_extensions = ('.vst3', '.component', '.au', '.so')
-    
-    for root, _, files in os.walk(directory):
-        # Check files with VST extensions
-        for file in files:
-            if file.lower().endswith(vst_extensions):
-                full_path = os.path.join(root, file)
-                # For .vst3 directories, look inside the bundle
-                if os.path.isdir(full_path) and full_path.lower().endswith('.vst3'):
-                    binary_path = find_vst_binary_in_bundle(full_path)
-                    if binary_path:
-                        plugins.append(binary_path)
-                else:
-                    plugins.append(full_path)
-                    
-    return plugins
\ No newline at end of file
+    return list(_iter_plugins(directory))
\ No newline at end of file